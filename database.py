@@ -0,0 +1,216 @@
+import asyncio
+import os
+import pathlib
+from contextlib import asynccontextmanager
+from typing import Any, Awaitable, Callable
+
+import aiosqlite
+
+from logger import get_logger
+
+logger = get_logger(__name__)
+
+# A write to run on the write connection, see WriteBatcher
+WriteJob = Callable[[aiosqlite.Connection], Awaitable[Any]]
+
+
+async def open_connection(db_path: str, read_only: bool = False) -> aiosqlite.Connection:
+    """Open a connection to the database and apply the connection PRAGMAs"""
+    # Room for every statement the app issues; transactions are always explicit
+    options = dict(cached_statements=256, isolation_level=None)
+    if read_only:
+        # mode=ro makes SQLite itself refuse writes
+        uri = f"{pathlib.Path(db_path).absolute().as_uri()}?mode=ro"
+        connection = await aiosqlite.connect(uri, uri=True, **options)
+    else:
+        connection = await aiosqlite.connect(db_path, **options)
+
+    # Enable WAL mode for better concurrent access
+    if not read_only:
+        cursor = await connection.execute("PRAGMA journal_mode=WAL")
+        journal_mode = await cursor.fetchone()
+        await cursor.close()
+        if not journal_mode or journal_mode[0].lower() != "wal":
+            logger.warning("Could not enable WAL mode, journal mode is %s", journal_mode)
+
+    # One script, so one round trip to the connection's thread
+    busy_timeout = int(os.getenv("DATABASE_BUSY_TIMEOUT", "30000"))
+    pragmas = [
+        f"PRAGMA busy_timeout={busy_timeout};",
+        "PRAGMA cache_size=-65536;",  # 64 MB
+        "PRAGMA temp_store=MEMORY;",
+        "PRAGMA mmap_size=268435456;",  # 256 MB
+    ]
+    if read_only:
+        pragmas.append("PRAGMA query_only=1;")
+    else:
+        # NORMAL is safe in WAL mode: only checkpoints need to fsync
+        pragmas.append("PRAGMA synchronous=NORMAL;")
+        pragmas.append("PRAGMA wal_autocheckpoint=1000;")
+    await connection.executescript("\n".join(pragmas))
+
+    return connection
+
+
+@asynccontextmanager
+async def immediate_transaction(connection: aiosqlite.Connection):
+    """Run the block in a transaction that waits for the write lock before any work"""
+    await connection.execute("BEGIN IMMEDIATE")
+    try:
+        yield connection
+    except BaseException:
+        await connection.rollback()
+        raise
+    await connection.commit()
+
+
+class ConnectionPool:
+    """Fixed set of connections, each used by one request at a time"""
+
+    def __init__(self, connections: list[aiosqlite.Connection]):
+        self._connections = connections
+        # Most recently used first, so light traffic stays on warm caches
+        self._idle: asyncio.LifoQueue[aiosqlite.Connection] = asyncio.LifoQueue()
+        for connection in connections:
+            self._idle.put_nowait(connection)
+
+    @classmethod
+    async def open(cls, db_path: str, size: int, read_only: bool = False) -> "ConnectionPool":
+        """Open size connections to the database file at db_path"""
+        if db_path == ":memory:":
+            # Each connection would get a separate, private database
+            raise ValueError("ConnectionPool needs a database file, not :memory:")
+        connections = [await open_connection(db_path, read_only) for _ in range(size)]
+        return cls(connections)
+
+    async def warm(self, statements: list[tuple[str, tuple]]):
+        """Run each statement once on every connection, to prepare it and load its pages"""
+        for connection in self._connections:
+            for sql, parameters in statements:
+                try:
+                    await connection.execute_fetchall(sql, parameters)
+                except aiosqlite.Error as e:
+                    # Not fatal: the request that needs it will report the error
+                    logger.warning("Could not warm statement %r: %s", sql, e)
+
+    @asynccontextmanager
+    async def acquire(self):
+        """Wait for an idle connection and hand it back once the caller is done"""
+        connection = await self._idle.get()
+        try:
+            yield connection
+        finally:
+            self._idle.put_nowait(connection)
+
+    async def close(self):
+        for connection in self._connections:
+            await connection.close()
+
+
+class WriteBatcher:
+    """Commits write jobs submitted within `window` seconds of each other together"""
+
+    def __init__(self, pool: ConnectionPool, window: float = 0.005):
+        self._pool = pool
+        self._window = window
+        self._pending: list[tuple[WriteJob, asyncio.Future]] = []
+        self._wakeup = asyncio.Event()
+        self._closing = False
+        self._task: asyncio.Task | None = None
+
+    def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    async def close(self):
+        """Commit anything still queued and stop the background task"""
+        self._closing = True
+        self._wakeup.set()
+        if self._task is not None:
+            await self._task
+
+    async def submit(self, job: WriteJob) -> Any:
+        """Queue job(connection) and return its result once the batch is committed"""
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((job, future))
+        self._wakeup.set()
+        return await future
+
+    async def _run(self):
+        while True:
+            await self._wakeup.wait()
+            if not self._closing:
+                # Give concurrent requests a moment to join this batch
+                await asyncio.sleep(self._window)
+            self._wakeup.clear()
+
+            batch, self._pending = self._pending, []
+            if batch:
+                try:
+                    await self._run_batch(batch)
+                except Exception as e:
+                    logger.error("Batched commit of %s writes failed: %s", len(batch), e, exc_info=True)
+                    for _, future in batch:
+                        if not future.done():
+                            future.set_exception(e)
+
+            if self._closing and not self._pending:
+                return
+
+    async def _run_batch(self, batch: list[tuple[WriteJob, asyncio.Future]]):
+        outcomes: list[tuple[asyncio.Future, Any, Exception | None]] = []
+        async with self._pool.acquire() as connection, immediate_transaction(connection):
+            for job, future in batch:
+                # A failing job only rolls back itself
+                await connection.execute("SAVEPOINT job")
+                try:
+                    result = await job(connection)
+                except Exception as e:
+                    await connection.execute("ROLLBACK TO job")
+                    outcomes.append((future, None, e))
+                else:
+                    outcomes.append((future, result, None))
+                await connection.execute("RELEASE job")
+
+        for future, result, error in outcomes:
+            if future.done():  # The caller went away
+                continue
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(result)
+
+
+class WalCheckpointer:
+    """Keeps the WAL short with passive checkpoints, and truncates it on close"""
+
+    def __init__(self, pool: ConnectionPool, interval: float = 30.0):
+        self._pool = pool
+        self._interval = interval
+        self._task: asyncio.Task | None = None
+
+    def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    async def close(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        await self._checkpoint("TRUNCATE")
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self._interval)
+            await self._checkpoint("PASSIVE")
+
+    async def _checkpoint(self, mode: str):
+        try:
+            async with self._pool.acquire() as connection:
+                rows = await connection.execute_fetchall(f"PRAGMA wal_checkpoint({mode})")
+        except aiosqlite.Error as e:
+            logger.warning("WAL checkpoint (%s) failed: %s", mode, e)
+            return
+        busy, wal_pages, checkpointed_pages = rows[0]
+        logger.debug("WAL checkpoint (%s): %s of %s pages, busy=%s", mode, checkpointed_pages, wal_pages, busy)
@@ -1,22 +1,53 @@
 import logging
+import logging.handlers
+import queue
 import sys
 import os
 
+# Writes log records to stdout and the log file on a background thread, so
+# logging from request handlers never blocks the event loop on I/O. The
+# QueueHandler still formats the message and any traceback on the caller's thread.
+_listener: logging.handlers.QueueListener | None = None
+_queue_handler: logging.handlers.QueueHandler | None = None
+
 def setup_logging():
+    global _listener, _queue_handler
+    if _listener is not None:
+        return
+
     log_dir = os.getenv("LOG_DIR", "/app/logs")
     os.makedirs(log_dir, exist_ok=True)
 
     log_level = os.getenv("LOG_LEVEL", "INFO").upper()
     numeric_level = getattr(logging, log_level, logging.INFO)
 
-    logging.basicConfig(
-        level=numeric_level,
-        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-        handlers=[
-            logging.StreamHandler(sys.stdout),
-            logging.FileHandler(f"{log_dir}/auction-server-logs.log")
-        ]
-    )
+    formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    handlers = [
+        logging.StreamHandler(sys.stdout),
+        logging.FileHandler(f"{log_dir}/auction-server-logs.log")
+    ]
+    for handler in handlers:
+        handler.setFormatter(formatter)
+
+    log_queue = queue.SimpleQueue()
+    _listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+
+    root_logger = logging.getLogger()
+    root_logger.setLevel(numeric_level)
+    _queue_handler = logging.handlers.QueueHandler(log_queue)
+    root_logger.addHandler(_queue_handler)
+
+def stop_logging():
+    """Flush queued log records, stop the background writer and write any later records directly"""
+    global _listener, _queue_handler
+    if _listener is not None:
+        _listener.stop()
+        root_logger = logging.getLogger()
+        root_logger.removeHandler(_queue_handler)
+        for handler in _listener.handlers:
+            root_logger.addHandler(handler)
+        _listener = _queue_handler = None
 
 def get_logger(name: str = __name__):
     return logging.getLogger(name)
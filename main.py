@@ -1,15 +1,22 @@
+import asyncio
+import base64
+import hashlib
+import hmac
+import logging
 import os
 import secrets
-import uuid
+import struct
+import time
 from contextlib import asynccontextmanager
 
 import aiosqlite
-from fastapi import FastAPI, HTTPException, Depends, Response, Cookie
+from fastapi import FastAPI, HTTPException, Depends, Request, Response, Cookie
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel
 from starlette.middleware.cors import CORSMiddleware
-from itsdangerous import URLSafeTimedSerializer, SignatureExpired, BadSignature
 
-from logger import setup_logging, get_logger
+from database import ConnectionPool, WalCheckpointer, WriteBatcher, immediate_transaction
+from logger import setup_logging, stop_logging, get_logger
 
 setup_logging()
 logger = get_logger(__name__)
@@ -20,38 +27,156 @@ if not SECRET_KEY:
     raise ValueError("SECRET_KEY environment variable must be set")
 SESSION_MAX_AGE = int(os.getenv("SESSION_MAX_AGE", "604800"))  # Default: 7 days in seconds
 ADMIN_SESSION_MAX_AGE = int(os.getenv("ADMIN_SESSION_MAX_AGE", "1800"))  # Default: 30 minutes
+COOKIE_SECURE = os.getenv("COOKIE_SECURE", "true").lower() == "true"
+
+# set_cookie() arguments for the session cookies
+SESSION_COOKIE = dict(
+    key="session",
+    max_age=SESSION_MAX_AGE,
+    httponly=True,
+    secure=COOKIE_SECURE,
+    samesite="none",
+    path="/"
+)
+ADMIN_SESSION_COOKIE = dict(SESSION_COOKIE, key="admin_session", max_age=ADMIN_SESSION_MAX_AGE)
+
+# Session tokens are base64url(user_id, issued_at as little-endian uint32s
+# + the first 16 bytes of their HMAC-SHA256)
+_SIGNER = hmac.new(SECRET_KEY.encode(), digestmod=hashlib.sha256)
+_TOKEN_PAYLOAD = struct.Struct("<II")
+_TAG_SIZE = 16
+_TOKEN_SIZE = _TOKEN_PAYLOAD.size + _TAG_SIZE
+
+# Bid IDs are handed out signed, as base64url(bid_id as a little-endian uint32
+# + the first 8 bytes of its HMAC-SHA256), so clients can't enumerate other bids
+_BID_ID = struct.Struct("<I")
+_BID_TAG_SIZE = 8
+
+
+def _sign(payload: bytes) -> bytes:
+    mac = _SIGNER.copy()
+    mac.update(payload)
+    return mac.digest()
+
+
+# Only the admin password's HMAC is kept, so attempts are compared at a fixed length
+_ADMIN_PASSWORD = os.getenv("ADMIN_PASSWORD")
+_ADMIN_PASSWORD_DIGEST = _sign(_ADMIN_PASSWORD.encode()) if _ADMIN_PASSWORD else None
+del _ADMIN_PASSWORD
+
+
+def _create_token(user_id: int, issued_at: int) -> str:
+    payload = _TOKEN_PAYLOAD.pack(user_id, issued_at)
+    return base64.urlsafe_b64encode(payload + _sign(payload)[:_TAG_SIZE]).decode()
+
+
+def _decode_token(token: str) -> bytes:
+    """Decode a token, raising ValueError unless it is spelled exactly as we encode it"""
+    # Strict, so each token has exactly one spelling that decodes
+    raw = base64.b64decode(token, altchars=b"-_", validate=True)
+    if base64.urlsafe_b64encode(raw).decode() != token:
+        raise ValueError("Malformed token")
+    return raw
 
-# Initialize Cookie serializer
-serializer = URLSafeTimedSerializer(SECRET_KEY)
+
+def _load_token(raw: bytes, max_age: int) -> tuple[int, int]:
+    """Return the user ID and issue time in a decoded token, raising ValueError if it is invalid or expired"""
+    if len(raw) != _TOKEN_SIZE:
+        raise ValueError("Malformed token")
+    payload, tag = raw[:_TOKEN_PAYLOAD.size], raw[_TOKEN_PAYLOAD.size:]
+    if not hmac.compare_digest(tag, _sign(payload)[:_TAG_SIZE]):
+        raise ValueError("Signature does not match")
+
+    user_id, issued_at = _TOKEN_PAYLOAD.unpack(payload)
+    if time.time() - issued_at > max_age:
+        raise ValueError("Token expired")
+    return user_id, issued_at
 
 
 def create_session_token(user_id: int) -> str:
     """Create signed session token containing user ID"""
-    return serializer.dumps(user_id)
+    # Dated after the user's last logout, even within the same second, so it isn't refused
+    issued_at = max(int(time.time()), _SESSIONS_REVOKED_AT.get(user_id, -1) + 1)
+    return _create_token(user_id, issued_at)
+
+
+# Verified session tokens -> (user_id, issued_at), least recently used first
+_SESSION_CACHE: dict[str, tuple[int, int]] = {}
+_SESSION_CACHE_SIZE = 4096
+
+# user_id -> time of their last logout; tokens issued at or before it are refused
+_SESSIONS_REVOKED_AT: dict[int, int] = {}
 
 
 def validate_session_token(token: str) -> int | None:
     """Validate and extract user ID from session token"""
+    cached = _SESSION_CACHE.pop(token, None)
+    if cached is not None:
+        user_id, issued_at = cached
+        if (
+            time.time() - issued_at <= SESSION_MAX_AGE
+            and issued_at > _SESSIONS_REVOKED_AT.get(user_id, -1)
+        ):
+            _SESSION_CACHE[token] = cached  # Now the most recently used
+            return user_id
+
     try:
-        user_id = serializer.loads(token, max_age=SESSION_MAX_AGE)
-        return user_id
-    except (SignatureExpired, BadSignature) as e:
-        logger.warning(f"Invalid session token: {str(e)}")
+        user_id, issued_at = _load_token(_decode_token(token), SESSION_MAX_AGE)
+    except ValueError as e:
+        logger.warning("Invalid session token: %s", e)
+        return None
+    if issued_at <= _SESSIONS_REVOKED_AT.get(user_id, -1):
+        logger.warning("Invalid session token: logged out")
         return None
 
+    if len(_SESSION_CACHE) >= _SESSION_CACHE_SIZE:
+        del _SESSION_CACHE[next(iter(_SESSION_CACHE))]
+    _SESSION_CACHE[token] = (user_id, issued_at)
+    return user_id
+
+
+def revoke_session_token(token: str):
+    """Refuse this session token, and every older one of the same user"""
+    _SESSION_CACHE.pop(token, None)
+    try:
+        user_id, issued_at = _load_token(_decode_token(token), SESSION_MAX_AGE)
+    except ValueError:
+        return  # Already refused on its own
+
+    # A token can be dated up to a second ahead, see create_session_token
+    _SESSIONS_REVOKED_AT[user_id] = max(int(time.time()), issued_at)
+
 
 def create_admin_session_token() -> str:
     """Create signed admin session token (user_id = 0 for admin)"""
-    return serializer.dumps(0)
+    return _create_token(0, int(time.time()))
+
+
+def create_bid_token(bid_id: int) -> str:
+    """Create the opaque, signed ID a client uses to refer to one of its bids"""
+    payload = _BID_ID.pack(bid_id)
+    return base64.urlsafe_b64encode(payload + _sign(payload)[:_BID_TAG_SIZE]).decode()
+
+
+def load_bid_token(token: str) -> int | None:
+    """Return the bid ID in a bid token, or None if it wasn't issued by us"""
+    try:
+        raw = _decode_token(token)
+    except ValueError:
+        return None
+    payload, tag = raw[:_BID_ID.size], raw[_BID_ID.size:]
+    if len(tag) != _BID_TAG_SIZE or not hmac.compare_digest(tag, _sign(payload)[:_BID_TAG_SIZE]):
+        return None
+    return _BID_ID.unpack(payload)[0]
 
 
 def validate_admin_session(token: str) -> bool:
     """Validate admin session token with 30-minute expiry"""
     try:
-        user_id = serializer.loads(token, max_age=ADMIN_SESSION_MAX_AGE)
+        user_id, _ = _load_token(_decode_token(token), ADMIN_SESSION_MAX_AGE)
         return user_id == 0  # Admin is identified by user_id = 0
-    except (SignatureExpired, BadSignature) as e:
-        logger.warning(f"Invalid admin session token: {str(e)}")
+    except ValueError as e:
+        logger.warning("Invalid admin session token: %s", e)
         return False
 
 
@@ -66,6 +191,12 @@ def verify_admin_session(admin_session: str | None = Cookie(None)):
 
 
 # Pydantic Models
+class UserBid(BaseModel):
+    uid: str
+    amount: int
+    is_highest: bool
+
+
 class Item(BaseModel):
     id: int
     title: str
@@ -120,307 +251,524 @@ class AdminLoginRequest(BaseModel):
     password: str
 
 
-db_connection = None
+# Bids and donations tables still keyed by UUID are rebuilt at startup. Rows
+# whose item or account is gone are kept in orphaned_bids / orphaned_donations.
+SQL_TABLE_HAS_UUID = "SELECT 1 FROM pragma_table_info(?) WHERE name = 'uuid'"
+
+SQL_MIGRATE_BIDS_TO_ID = """
+BEGIN;
+CREATE TABLE IF NOT EXISTS orphaned_bids AS SELECT * FROM bids WHERE 0;
+INSERT INTO orphaned_bids SELECT * FROM bids
+    WHERE item_id NOT IN (SELECT id FROM items) OR user_id NOT IN (SELECT id FROM accounts);
+CREATE TABLE "bids_new" (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id INTEGER NOT NULL,
+    item_id INTEGER NOT NULL,
+    amount INTEGER NOT NULL,
+    created_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (user_id) REFERENCES accounts(id),
+    FOREIGN KEY (item_id) REFERENCES items(id)
+);
+INSERT INTO bids_new (user_id, item_id, amount, created_at)
+    SELECT user_id, item_id, amount, created_at FROM bids
+    WHERE item_id IN (SELECT id FROM items) AND user_id IN (SELECT id FROM accounts)
+    ORDER BY created_at, rowid;
+DROP TABLE bids;
+ALTER TABLE bids_new RENAME TO bids;
+COMMIT;
+"""
+
+SQL_MIGRATE_DONATIONS_TO_USER_ID = """
+BEGIN;
+CREATE TABLE IF NOT EXISTS orphaned_donations AS SELECT * FROM donations WHERE 0;
+INSERT INTO orphaned_donations SELECT * FROM donations
+    WHERE user_id NOT IN (SELECT id FROM accounts);
+CREATE TABLE "donations_new" (
+    user_id INTEGER PRIMARY KEY,
+    amount INTEGER NOT NULL,
+    updated_at DATETIME NOT NULL,
+    FOREIGN KEY (user_id) REFERENCES accounts(id)
+);
+INSERT INTO donations_new (user_id, amount, updated_at)
+    SELECT user_id, amount, updated_at FROM donations
+    WHERE user_id IN (SELECT id FROM accounts);
+DROP TABLE donations;
+ALTER TABLE donations_new RENAME TO donations;
+COMMIT;
+"""
+
+SQL_COUNT_ORPHANED_BIDS = "SELECT count(*) FROM orphaned_bids"
+
+SQL_COUNT_ORPHANED_DONATIONS = "SELECT count(*) FROM orphaned_donations"
+
+# (table, migration script, count of the rows it set aside)
+UUID_MIGRATIONS = [
+    ("bids", SQL_MIGRATE_BIDS_TO_ID, SQL_COUNT_ORPHANED_BIDS),
+    ("donations", SQL_MIGRATE_DONATIONS_TO_USER_ID, SQL_COUNT_ORPHANED_DONATIONS),
+]
+
+SQL_DISABLE_FOREIGN_KEYS = "PRAGMA foreign_keys=OFF"
+
+SQL_FOREIGN_KEY_CHECK = "PRAGMA foreign_key_check"
+
+SQL_ENABLE_FOREIGN_KEYS = "PRAGMA foreign_keys=ON"
+
+# Also in schema.sql; created here for existing databases
+SQL_CREATE_INDEXES = """
+CREATE INDEX IF NOT EXISTS idx_bids_item_amount ON bids(item_id, amount DESC);
+CREATE INDEX IF NOT EXISTS idx_bids_user_item ON bids(user_id, item_id);
+"""
+
+# Each item comes back already encoded in the Item JSON shape
+SQL_ITEMS = """SELECT
+           i.id,
+           json_object(
+               'id', i.id,
+               'title', i.title,
+               'image', i.img_location,
+               'author', i.author,
+               'authorDescription', i.author_description,
+               'minimumBid', i.min_bid,
+               'currentBid', (SELECT MAX(amount) FROM bids WHERE item_id = i.id),
+               'year', i.year,
+               'description', i.description,
+               'showOrder', i.show_order,
+               'isClosed', json(CASE WHEN i.is_closed != 0 THEN 'true' ELSE 'false' END)
+           )
+       FROM items i
+       ORDER BY i.show_order"""
+
+SQL_HEALTHCHECK = "SELECT 1"
+
+SQL_UPSERT_ACCOUNT = """INSERT INTO accounts (name, email) VALUES (?, ?)
+       ON CONFLICT(email) DO UPDATE SET name = excluded.name
+       RETURNING id"""
+
+# is_closed is always compared with 0, so any other stored value means closed
+SQL_PLACE_BID = """INSERT INTO bids (user_id, item_id, amount)
+       SELECT :user_id, i.id, :amount
+       FROM items i
+       WHERE i.id = :item_id
+         AND i.is_closed = 0
+         AND :amount >= i.min_bid
+         AND :amount > COALESCE((SELECT MAX(amount) FROM bids WHERE item_id = i.id), 0)
+       RETURNING id"""
+
+SQL_BID_REJECTION = """SELECT
+           i.min_bid,
+           i.is_closed != 0,
+           COALESCE((SELECT MAX(amount) FROM bids WHERE item_id = i.id), 0)
+       FROM items i
+       WHERE i.id = ?"""
+
+# A user's latest bid on an item, and whether it is still the highest
+SQL_USER_LATEST_BID = """SELECT
+           b.id,
+           b.amount,
+           b.amount >= (SELECT MAX(amount) FROM bids WHERE item_id = b.item_id)
+       FROM bids b
+       WHERE b.user_id = ? AND b.item_id = ?
+       ORDER BY b.id DESC
+       LIMIT 1"""
+
+# A user's latest bid on every item, and whether each is still the highest
+SQL_USER_LATEST_BIDS = """SELECT
+           b.item_id,
+           b.id,
+           b.amount,
+           b.amount >= (SELECT MAX(amount) FROM bids WHERE item_id = b.item_id)
+       FROM bids b
+       WHERE b.user_id = ?
+         AND b.id = (SELECT MAX(id) FROM bids WHERE user_id = b.user_id AND item_id = b.item_id)"""
+
+SQL_USER_BID_ITEM = "SELECT item_id FROM bids WHERE id = ? AND user_id = ?"
+
+SQL_ITEM_IS_CLOSED = "SELECT is_closed != 0 FROM items WHERE id = ?"
+
+SQL_DELETE_BID = "DELETE FROM bids WHERE id = ? AND user_id = ?"
+
+SQL_UPSERT_DONATION = """INSERT INTO donations (user_id, amount, updated_at)
+       VALUES (?, ?, CURRENT_TIMESTAMP)
+       ON CONFLICT(user_id) DO UPDATE SET
+           amount = excluded.amount,
+           updated_at = excluded.updated_at"""
+
+SQL_USER_DONATION = "SELECT amount FROM donations WHERE user_id = ?"
+
+# The whole /admin/bids body: item_id -> its bids, newest first
+SQL_ADMIN_BIDS = """SELECT json_group_object(i.id, (
+           SELECT json_group_array(json_object(
+               'itemTitle', i.title,
+               'bidderName', ub.name,
+               'userEmail', ub.email,
+               'amount', ub.amount,
+               'createdAt', ub.created_at
+           ))
+           FROM (
+               SELECT a.name, a.email, b.amount, b.created_at
+               FROM bids b
+               JOIN accounts a ON b.user_id = a.id
+               WHERE b.item_id = i.id
+               ORDER BY b.id DESC
+           ) ub
+       ))
+       FROM items i
+       WHERE EXISTS (SELECT 1 FROM bids WHERE item_id = i.id)"""
+
+SQL_ADMIN_DONATIONS = """SELECT
+           a.name,
+           a.email,
+           d.amount,
+           d.updated_at
+       FROM donations d
+       JOIN accounts a ON d.user_id = a.id
+       ORDER BY d.updated_at DESC"""
+
+# Read statements compiled on every read connection at startup
+WARM_READ_STATEMENTS = [
+    (SQL_HEALTHCHECK, ()),
+    (SQL_ITEMS, ()),
+]
+
+
+read_pool: ConnectionPool | None = None
+admin_pool: ConnectionPool | None = None
+write_pool: ConnectionPool | None = None
+write_batcher: WriteBatcher | None = None
+wal_checkpointer: WalCheckpointer | None = None
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    global db_connection
+    global read_pool, admin_pool, write_pool, write_batcher, wal_checkpointer
 
     logger.info("Application starting up")
 
     db_path = os.getenv("DATABASE_PATH", "/app/data/auction.db")
+    if db_path == ":memory:":
+        # Every pooled connection would open its own, empty database
+        raise ValueError("DATABASE_PATH must be a database file, not :memory:")
 
     os.makedirs(os.path.dirname(db_path), exist_ok=True)
 
-    db_connection = await aiosqlite.connect(db_path)
-
-    # Enable WAL mode for better concurrent access
-    await db_connection.execute("PRAGMA journal_mode=WAL")
-
-    # Set busy timeout
-    busy_timeout = int(os.getenv("DATABASE_BUSY_TIMEOUT", "5000"))
-    await db_connection.execute(f"PRAGMA busy_timeout={busy_timeout}")
-
-    logger.info(f"Database connected: {db_path} (WAL mode enabled)")
+    # SQLite allows a single writer, so writes share one connection
+    read_pool_size = int(os.getenv("DATABASE_READ_POOL_SIZE", str(os.cpu_count() or 4)))
+    write_pool = await ConnectionPool.open(db_path, size=1)
+    async with write_pool.acquire() as db:
+        # foreign_keys can't be changed inside the scripts' transactions
+        await db.execute(SQL_DISABLE_FOREIGN_KEYS)
+        for table, migration, count_orphans in UUID_MIGRATIONS:
+            if await db.execute_fetchall(SQL_TABLE_HAS_UUID, (table,)):
+                logger.info("Migrating %s off UUID keys", table)
+                await db.executescript(migration)
+                [(orphans,)] = await db.execute_fetchall(count_orphans)
+                if orphans:
+                    logger.warning("Moved %s orphaned %s rows to orphaned_%s", orphans, table, table)
+        await db.executescript(SQL_CREATE_INDEXES)
+        # Enforced only once the data is migrated; report anything still violating them
+        violations = await db.execute_fetchall(SQL_FOREIGN_KEY_CHECK)
+        for table, rowid, parent, _ in violations:
+            logger.warning("%s row %s references a missing %s row", table, rowid, parent)
+        await db.execute(SQL_ENABLE_FOREIGN_KEYS)
+    read_pool = await ConnectionPool.open(db_path, size=read_pool_size, read_only=True)
+    await read_pool.warm(WARM_READ_STATEMENTS)
+    # Admin reports scan every bid, so they get a connection of their own
+    admin_pool = await ConnectionPool.open(db_path, size=1, read_only=True)
+    write_batcher = WriteBatcher(write_pool)
+    write_batcher.start()
+    wal_checkpointer = WalCheckpointer(write_pool)
+    wal_checkpointer.start()
+    heartbeat = asyncio.create_task(database_heartbeat())
+
+    logger.info("Database connected: %s (WAL mode enabled, %s read connections)", db_path, read_pool_size)
 
     yield
 
     logger.info("Application shutting down")
-    await db_connection.close()
-    logger.info("Database connection closed")
+    heartbeat.cancel()
+    try:
+        await heartbeat
+    except asyncio.CancelledError:
+        pass
+    await write_batcher.close()
+    await wal_checkpointer.close()
+    await read_pool.close()
+    await admin_pool.close()
+    await write_pool.close()
+    logger.info("Database connections closed")
+    stop_logging()
 
 
-app = FastAPI(lifespan=lifespan)
+app = FastAPI(lifespan=lifespan, default_response_class=ORJSONResponse)
 
 # Configure CORS
-cors_origins = os.getenv(
-    "CORS_ORIGINS",
-    "https://auriform-derrick-spectrographic.ngrok-free.dev"
-).split(",")
+CORS_ORIGINS = [
+    origin.strip()
+    for origin in os.getenv("CORS_ORIGINS", "https://auriform-derrick-spectrographic.ngrok-free.dev").split(",")
+]
+# Request headers the frontend may send beyond the CORS-safelisted ones
+CORS_ALLOW_HEADERS = [
+    header.strip()
+    for header in os.getenv("CORS_ALLOW_HEADERS", "content-type,ngrok-skip-browser-warning").split(",")
+]
 
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=[origin.strip() for origin in cors_origins],
+    allow_origins=CORS_ORIGINS,
     allow_credentials=True,
-    allow_methods=["*"],  # Allow all methods (GET, POST, etc.)
-    allow_headers=["*"],  # Allow all headers
+    # Fixed lists, so Starlette can precompute the preflight response
+    allow_methods=["GET", "POST", "DELETE"],
+    allow_headers=CORS_ALLOW_HEADERS,
+    max_age=86400,  # Let browsers cache preflight responses for 24 hours
 )
 
 
-async def get_db():
-    return db_connection
+async def get_read_db():
+    async with read_pool.acquire() as db:
+        yield db
+
+
+async def get_admin_db():
+    async with admin_pool.acquire() as db:
+        yield db
+
+
+async def get_write_db():
+    async with write_pool.acquire() as db:
+        yield db
+
+
+ROOT_BODY = b'{"message":"Hello World!"}'
 
 
 @app.get("/")
 async def read_root():
-    return {"message": "Hello World!"}
+    return Response(content=ROOT_BODY, media_type="application/json")
 
 
-@app.get("/healthcheck")
-async def health_check(db: aiosqlite.Connection = Depends(get_db)):
-    try:
-        cursor = await db.execute("SELECT 1")
-        result = await cursor.fetchone()
-        await cursor.close()
+HEALTHY_BODY = b'{"status":"healthy"}'
 
-        if result and result[0] == 1:
-            return {
-                "status": "healthy"
-            }
-        else:
-            logger.error("Health check failed: unexpected query result")
-            raise HTTPException(
-                status_code=503,
-                detail="Database check failed"
-            )
-    except HTTPException:
-        raise
+
+HEALTH_CHECK_INTERVAL = 5.0  # seconds
+# A result older than this means the heartbeat itself is stuck
+HEALTH_CHECK_MAX_AGE = 2 * HEALTH_CHECK_INTERVAL
+
+# (time.monotonic() of the last database check, error detail or None if healthy)
+_last_db_check: tuple[float, str | None] | None = None
+
+
+async def check_database() -> str | None:
+    """Run a trivial query, returning an error detail if the database is unhealthy"""
+    try:
+        async with read_pool.acquire() as db:
+            rows = await db.execute_fetchall(SQL_HEALTHCHECK)
     except Exception as e:
-        logger.error(f"Health check failed: {str(e)}", exc_info=True)
-        raise HTTPException(
-            status_code=503,
-            detail=f"Database unhealthy: {str(e)}"
-        )
+        # Probes hit this repeatedly while the database is down
+        logger.error("Health check failed: %s", e, exc_info=logger.isEnabledFor(logging.DEBUG))
+        return f"Database unhealthy: {str(e)}"
+
+    if rows and rows[0][0] == 1:
+        return None
+
+    logger.error("Health check failed: unexpected query result")
+    return "Database check failed"
+
+
+async def database_heartbeat():
+    """Check the database every HEALTH_CHECK_INTERVAL, so probes never have to"""
+    global _last_db_check
+    while True:
+        _last_db_check = (time.monotonic(), await check_database())
+        await asyncio.sleep(HEALTH_CHECK_INTERVAL)
 
 
-@app.get("/items", response_model=list[Item])
-async def get_items(db: aiosqlite.Connection = Depends(get_db)):
+@app.get("/healthcheck", include_in_schema=False)
+async def health_check():
+    """Report the database health seen by the last heartbeat"""
+    if _last_db_check is None:
+        raise HTTPException(status_code=503, detail="Database not checked yet")
+
+    checked_at, error = _last_db_check
+    if error:
+        raise HTTPException(status_code=503, detail=error)
+    if time.monotonic() - checked_at > HEALTH_CHECK_MAX_AGE:
+        logger.error("Health check failed: no database heartbeat for %.1fs", time.monotonic() - checked_at)
+        raise HTTPException(status_code=503, detail="Database heartbeat stalled")
+
+    return Response(content=HEALTHY_BODY, media_type="application/json")
+
+
+# Catalog shared by /items and /item/{id}. Writes call invalidate_catalog();
+# the TTL picks up edits made outside the app, e.g. in sqlite-web.
+CATALOG_TTL = 5.0  # seconds
+_CATALOG_EPOCH = secrets.token_hex(4)  # Stops ETags from an earlier process matching
+_catalog_version = 0
+# (version, time.monotonic() when read, /items body, /item/{id} bodies by ID)
+_catalog_cache: tuple[int, float, bytes, dict[int, bytes]] | None = None
+
+
+def invalidate_catalog():
+    """Mark the cached catalog stale so the next read re-reads the database"""
+    global _catalog_version
+    _catalog_version += 1
+
+
+# Absorbs polling bursts; browsers then revalidate with the ETag
+CATALOG_CACHE_CONTROL = "private, max-age=2"
+
+
+def catalog_etag(version: int, item_id: int | None = None) -> str:
+    """ETag of the /items body, or of one item's body if item_id is given"""
+    if item_id is None:
+        return f'W/"{_CATALOG_EPOCH}-{version}"'
+    return f'W/"{_CATALOG_EPOCH}-{version}-{item_id}"'
+
+
+async def get_catalog() -> tuple[int, float, bytes, dict[int, bytes]]:
+    """Return the cached catalog, re-reading the database if it is stale or expired"""
+    global _catalog_cache
+
+    cached = _catalog_cache
+    now = time.monotonic()
+    if cached is not None and cached[0] == _catalog_version and now - cached[1] < CATALOG_TTL:
+        return cached
+
+    version = _catalog_version
+    logger.info("Fetching items from database")
+    async with read_pool.acquire() as db:
+        rows = await db.execute_fetchall(SQL_ITEMS)
+
+    item_bodies = {item_id: body.encode() for item_id, body in rows}
+    body = b"[" + b",".join(item_bodies.values()) + b"]"
+    logger.info("Successfully fetched %s items", len(item_bodies))
+
+    if cached is not None and cached[0] == version and cached[2] != body:
+        # Changed outside the app, so the old ETag must stop matching
+        invalidate_catalog()
+        version = _catalog_version
+    catalog = (version, now, body, item_bodies)
+
+    # Don't cache a result that a concurrent write has already made stale
+    if version == _catalog_version:
+        _catalog_cache = catalog
+    return catalog
+
+
+@app.get("/items", responses={200: {"model": list[Item]}})
+async def get_items(request: Request):
     """Get all auction items ordered by show_order"""
     try:
-        logger.info("Fetching items from database")
-        cursor = await db.execute(
-            """SELECT
-                   i.id,
-                   i.title,
-                   i.img_location,
-                   i.author,
-                   i.author_description,
-                   i.min_bid,
-                   MAX(b.amount) as current_bid,
-                   i.year,
-                   i.description,
-                   i.show_order,
-                   i.is_closed
-               FROM items i
-               LEFT JOIN bids b ON i.id = b.item_id
-               GROUP BY i.id
-               ORDER BY i.show_order"""
-        )
-        rows = await cursor.fetchall()
-        await cursor.close()
-
-        items = [
-            Item(
-                id=row[0],
-                title=row[1],
-                image=row[2],
-                author=row[3],
-                authorDescription=row[4],
-                minimumBid=row[5],
-                currentBid=row[6],
-                year=row[7],
-                description=row[8],
-                showOrder=row[9],
-                isClosed=bool(row[10])
-            )
-            for row in rows
-        ]
-
-        logger.info(f"Successfully fetched {len(items)} items")
-        return items
+        version, _, body, _ = await get_catalog()
     except Exception as e:
-        logger.error(f"Failed to fetch items: {str(e)}", exc_info=True)
+        logger.error("Failed to fetch items: %s", e, exc_info=True)
         raise HTTPException(
             status_code=500,
             detail="Failed to fetch items from database"
         )
 
+    headers = {"ETag": catalog_etag(version), "Cache-Control": CATALOG_CACHE_CONTROL}
+    if request.headers.get("if-none-match") == headers["ETag"]:
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
 
-@app.get("/item/{id}", response_model=Item)
-async def get_item(id: int, db: aiosqlite.Connection = Depends(get_db)):
+@app.get("/item/{id}", responses={200: {"model": Item}})
+async def get_item(id: int, request: Request):
     """Get a single auction item by ID"""
     try:
-        logger.info(f"Fetching item {id} from database")
-        cursor = await db.execute(
-            """SELECT
-                   i.id,
-                   i.title,
-                   i.img_location,
-                   i.author,
-                   i.author_description,
-                   i.min_bid,
-                   MAX(b.amount) as current_bid,
-                   i.year,
-                   i.description,
-                   i.show_order,
-                   i.is_closed
-               FROM items i
-               LEFT JOIN bids b ON i.id = b.item_id
-               WHERE i.id = ?
-               GROUP BY i.id""",
-            (id,)
-        )
-        row = await cursor.fetchone()
-        await cursor.close()
-
-        if not row:
-            logger.warning(f"Item {id} not found")
-            raise HTTPException(status_code=404, detail="Item not found")
-
-        item = Item(
-            id=row[0],
-            title=row[1],
-            image=row[2],
-            author=row[3],
-            authorDescription=row[4],
-            minimumBid=row[5],
-            currentBid=row[6],
-            year=row[7],
-            description=row[8],
-            showOrder=row[9],
-            isClosed=bool(row[10])
-        )
-
-        logger.info(f"Successfully fetched item {id}")
-        return item
-    except HTTPException:
-        raise
+        version, _, _, item_bodies = await get_catalog()
     except Exception as e:
-        logger.error(f"Failed to fetch item {id}: {str(e)}", exc_info=True)
+        logger.error("Failed to fetch item %s: %s", id, e, exc_info=True)
         raise HTTPException(
             status_code=500,
             detail="Failed to fetch item from database"
         )
 
+    body = item_bodies.get(id)
+    if body is None:
+        logger.warning("Item %s not found", id)
+        raise HTTPException(status_code=404, detail="Item not found")
+
+    headers = {"ETag": catalog_etag(version, id), "Cache-Control": CATALOG_CACHE_CONTROL}
+    if request.headers.get("if-none-match") == headers["ETag"]:
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+LOGIN_BODY = b'{"success": true, "message": "Logged in successfully"}'
+
 
 @app.post("/login")
-async def login(request: LoginRequest, db: aiosqlite.Connection = Depends(get_db)):
+async def login(request: LoginRequest):
     """Login or create user account and set session cookie"""
+    async def upsert_account(db: aiosqlite.Connection) -> int:
+        # Creates the account or, for a returning email, updates its name
+        rows = await db.execute_fetchall(SQL_UPSERT_ACCOUNT, (request.name, request.email))
+        return rows[0][0]
+
     try:
-        logger.info(f"Login attempt for email: {request.email}")
+        logger.info("Login attempt for email: %s", request.email)
+
+        # Logins arriving together are committed together
+        user_id = await write_batcher.submit(upsert_account)
+        logger.info("Logged in user id %s: %s - %s", user_id, request.name, request.email)
 
-        cursor = await db.execute(
-            "INSERT INTO accounts (name, email) VALUES (?, ?)",
-            (request.name, request.email)
-        )
-        await db.commit()
-        user_id = cursor.lastrowid
-        await cursor.close()
-        logger.info(f"Created new user with id {user_id}: {request.name} - {request.email}")
-
-    except aiosqlite.IntegrityError:
-        logger.info(f"User already exists: {request.email}")
-        cursor = await db.execute(
-            "UPDATE accounts SET name = ? WHERE email = ? RETURNING id",
-            (request.name, request.email,)
-        )
-        row = await cursor.fetchone()
-        await cursor.close()
-        await db.commit()
-
-        if row:
-            user_id = row[0]
-            logger.info(f"Updated name for existing user id {user_id}: {request.email}")
-        else:
-            logger.error(f"Database inconsistency for email: {request.email}")
-            raise HTTPException(status_code=500, detail="Database error")
     except Exception as e:
-        logger.error(f"Login failed for {request.email}: {str(e)}", exc_info=True)
+        logger.error("Login failed for %s: %s", request.email, e, exc_info=True)
         raise HTTPException(status_code=500, detail="Login failed")
 
     session_token = create_session_token(user_id)
 
-    response = Response(
-        content='{"success": true, "message": "Logged in successfully"}',
-        media_type="application/json"
-    )
+    response = Response(content=LOGIN_BODY, media_type="application/json")
 
-    cookie_secure = os.getenv("COOKIE_SECURE", "true").lower() == "true"
-    response.set_cookie(
-        key="session",
-        value=session_token,
-        max_age=SESSION_MAX_AGE,
-        httponly=True,
-        secure=cookie_secure,
-        samesite="none",
-        path="/"
-    )
+    response.set_cookie(value=session_token, **SESSION_COOKIE)
 
-    logger.info(f"Session cookie set for user {user_id}")
+    logger.info("Session cookie set for user %s", user_id)
     return response
 
 
+LOGOUT_BODY = b'{"success": true, "message": "Logged out successfully"}'
+
+
 @app.post("/logout")
-async def logout():
+async def logout(session: str | None = Cookie(None)):
     """Logout by clearing the session cookie"""
-    response = Response(
-        content='{"success": true, "message": "Logged out successfully"}',
-        media_type="application/json"
-    )
+    if session:
+        revoke_session_token(session)
+
+    response = Response(content=LOGOUT_BODY, media_type="application/json")
 
-    cookie_secure = os.getenv("COOKIE_SECURE", "true").lower() == "true"
     response.delete_cookie(
         key="session",
         path="/",
         samesite="none",
-        secure=cookie_secure
+        secure=COOKIE_SECURE
     )
 
     logger.info("User logged out - session cookie cleared")
     return response
 
 
+ADMIN_LOGIN_BODY = b'{"success": true, "message": "Admin logged in successfully"}'
+
+
 @app.post("/admin/login")
 async def admin_login(request: AdminLoginRequest):
     """Admin login - validates password and sets admin session cookie"""
     try:
-        admin_password = os.getenv("ADMIN_PASSWORD")
-        if not admin_password:
+        if _ADMIN_PASSWORD_DIGEST is None:
             raise ValueError("ADMIN_PASSWORD environment variable must be set")
 
-        is_correct = secrets.compare_digest(request.password, admin_password)
+        is_correct = hmac.compare_digest(_sign(request.password.encode()), _ADMIN_PASSWORD_DIGEST)
         if not is_correct:
             logger.warning("Admin login failed: invalid password")
             raise HTTPException(status_code=401, detail="Invalid admin password")
 
         admin_session_token = create_admin_session_token()
 
-        response = Response(
-            content='{"success": true, "message": "Admin logged in successfully"}',
-            media_type="application/json"
-        )
+        response = Response(content=ADMIN_LOGIN_BODY, media_type="application/json")
 
-        cookie_secure = os.getenv("COOKIE_SECURE", "true").lower() == "true"
-        response.set_cookie(
-            key="admin_session",
-            value=admin_session_token,
-            max_age=ADMIN_SESSION_MAX_AGE,
-            httponly=True,
-            secure=cookie_secure,
-            samesite="none",
-            path="/"
-        )
+        response.set_cookie(value=admin_session_token, **ADMIN_SESSION_COOKIE)
 
         logger.info("Admin session cookie set")
         return response
@@ -428,24 +776,23 @@ async def admin_login(request: AdminLoginRequest):
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Admin login failed: {str(e)}", exc_info=True)
+        logger.error("Admin login failed: %s", e, exc_info=True)
         raise HTTPException(status_code=500, detail="Admin login failed")
 
 
+ADMIN_LOGOUT_BODY = b'{"success": true, "message": "Admin logged out successfully"}'
+
+
 @app.post("/admin/logout")
 async def admin_logout():
     """Admin logout by clearing the admin session cookie. Currently not used."""
-    response = Response(
-        content='{"success": true, "message": "Admin logged out successfully"}',
-        media_type="application/json"
-    )
+    response = Response(content=ADMIN_LOGOUT_BODY, media_type="application/json")
 
-    cookie_secure = os.getenv("COOKIE_SECURE", "true").lower() == "true"
     response.delete_cookie(
         key="admin_session",
         path="/",
         samesite="none",
-        secure=cookie_secure
+        secure=COOKIE_SECURE
     )
 
     logger.info("Admin logged out - admin session cookie cleared")
@@ -453,13 +800,10 @@ async def admin_logout():
 
 
 @app.post("/bid")
-async def place_bid(
-        request: BidRequest,
-        db: aiosqlite.Connection = Depends(get_db),
-        session: str | None = Cookie(None)
-):
+async def place_bid(request: BidRequest, http_request: Request):
     """Place a bid on an auction item"""
     # Validate session cookie
+    session = http_request.cookies.get("session")
     if not session:
         logger.warning("Bid attempt without session cookie")
         raise HTTPException(status_code=401, detail="Authentication required")
@@ -469,133 +813,126 @@ async def place_bid(
         logger.warning("Bid attempt with invalid session token")
         raise HTTPException(status_code=401, detail="Invalid or expired session")
 
-    try:
-        logger.info(f"Bid attempt by user {user_id} for item {request.item_id}: ${request.amount}")
-
-        cursor = await db.execute(
-            "SELECT min_bid, is_closed FROM items WHERE id = ?",
-            (request.item_id,)
+    async def insert_bid(db: aiosqlite.Connection) -> tuple[int | None, list | None]:
+        # The insert checks the item is open and the bid high enough, atomically
+        inserted = await db.execute_fetchall(
+            SQL_PLACE_BID,
+            {"user_id": user_id, "item_id": request.item_id, "amount": request.amount}
         )
-        item_row = await cursor.fetchone()
-        await cursor.close()
+        if inserted:
+            return inserted[0][0], None
+        # Same transaction, so the reason matches the state the insert saw
+        return None, await db.execute_fetchall(SQL_BID_REJECTION, (request.item_id,))
 
-        if not item_row:
-            logger.warning(f"Bid attempt for non-existent item {request.item_id}")
-            raise HTTPException(status_code=404, detail="Item not found")
+    try:
+        logger.info("Bid attempt by user %s for item %s: $%s", user_id, request.item_id, request.amount)
 
-        min_bid = item_row[0]
-        is_closed = bool(item_row[1])
+        # Bids arriving together are committed together
+        bid_id, rows = await write_batcher.submit(insert_bid)
 
-        if is_closed:
-            raise HTTPException(
-                status_code=400,
-                detail="Bidding for this item has closed"
-            )
+        if bid_id is None:
+            # Work out which check rejected the bid
+            if not rows:
+                logger.warning("Bid attempt for non-existent item %s", request.item_id)
+                raise HTTPException(status_code=404, detail="Item not found")
 
-        if request.amount < min_bid:
-            logger.info(f"Bid rejected: amount ${request.amount} below minimum ${min_bid}")
-            raise HTTPException(
-                status_code=400,
-                detail=f"Bid amount must be at least ${min_bid}"
-            )
+            min_bid, is_closed, max_existing_bid = rows[0]
 
-        # Check for existing higher bids
-        cursor = await db.execute(
-            "SELECT MAX(amount) FROM bids WHERE item_id = ?",
-            (request.item_id,)
-        )
-        max_bid_row = await cursor.fetchone()
-        await cursor.close()
+            if is_closed:
+                raise HTTPException(
+                    status_code=400,
+                    detail="Bidding for this item has closed"
+                )
 
-        max_existing_bid = max_bid_row[0] if max_bid_row and max_bid_row[0] else 0
+            if request.amount < min_bid:
+                logger.info("Bid rejected: amount $%s below minimum $%s", request.amount, min_bid)
+                raise HTTPException(
+                    status_code=400,
+                    detail=f"Bid amount must be at least ${min_bid}"
+                )
 
-        if request.amount <= max_existing_bid:
-            logger.info(f"Bid rejected: amount ${request.amount} not higher than current bid ${max_existing_bid}")
+            logger.info("Bid rejected: amount $%s not higher than current bid $%s", request.amount, max_existing_bid)
             raise HTTPException(
                 status_code=400,
                 detail=f"There is a new higher bid of £{max_existing_bid}!"
             )
 
-        # Insert the bid
-        bid_uuid = str(uuid.uuid4())
-        cursor = await db.execute(
-            "INSERT INTO bids (uuid, user_id, item_id, amount) VALUES (?, ?, ?, ?)",
-            (bid_uuid, user_id, request.item_id, request.amount)
-        )
-        await db.commit()
-        await cursor.close()
+        invalidate_catalog()
 
-        logger.info(f"Bid placed successfully: {bid_uuid} by user {user_id} for ${request.amount}")
+        logger.info("Bid placed successfully: %s by user %s for $%s", bid_id, user_id, request.amount)
         return {"message": "Bid placed successfully"}
 
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Failed to place bid: {str(e)}", exc_info=True)
+        logger.error("Failed to place bid: %s", e, exc_info=True)
         raise HTTPException(status_code=500, detail="Failed to place bid")
 
 
 @app.get("/bid/{item_id}")
-async def get_user_bid(
-        item_id: int,
-        db: aiosqlite.Connection = Depends(get_db),
-        session: str | None = Cookie(None)
-):
+async def get_user_bid(item_id: int, request: Request):
     """Get user's latest bid for a specific item"""
+    # Polled per item, so only hold a connection while querying
+    session = request.cookies.get("session")
     if not session:
-        logger.info(f"Bid retrieval attempt for item {item_id} without session cookie")
+        logger.info("Bid retrieval attempt for item %s without session cookie", item_id)
         raise HTTPException(status_code=404, detail="Not found")
 
     user_id = validate_session_token(session)
     if not user_id:
-        logger.info(f"Bid retrieval attempt for item {item_id} with invalid session")
+        logger.info("Bid retrieval attempt for item %s with invalid session", item_id)
         raise HTTPException(status_code=404, detail="Not found")
 
     try:
-        cursor = await db.execute(
-            """SELECT uuid, amount
-               FROM bids
-               WHERE user_id = ? AND item_id = ?
-               ORDER BY created_at DESC
-               LIMIT 1""",
-            (user_id, item_id)
-        )
-        bid_row = await cursor.fetchone()
-        await cursor.close()
+        async with read_pool.acquire() as db:
+            rows = await db.execute_fetchall(SQL_USER_LATEST_BID, (user_id, item_id))
 
-        if not bid_row:
+        if not rows:
             raise HTTPException(status_code=404, detail="Not found")
 
-        bid_uuid = bid_row[0]
-        user_amount = bid_row[1]
-
-        cursor = await db.execute(
-            """SELECT MAX(amount)
-               FROM bids
-               WHERE item_id = ?""",
-            (item_id,)
-        )
-        max_bid_row = await cursor.fetchone()
-        await cursor.close()
-
-        max_amount = max_bid_row[0] if max_bid_row and max_bid_row[0] else 0
-        is_highest = user_amount >= max_amount
-
-        return {"uid": bid_uuid, "amount": user_amount, "is_highest": is_highest}
+        bid_id, user_amount, is_highest = rows[0]
+        return {"uid": create_bid_token(bid_id), "amount": user_amount, "is_highest": is_highest == 1}
 
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Failed to retrieve bid: {str(e)}", exc_info=True)
+        logger.error("Failed to retrieve bid: %s", e, exc_info=True)
         raise HTTPException(status_code=500, detail="Failed to retrieve bid")
 
+
+@app.get("/bids", responses={200: {"model": dict[int, UserBid]}})
+async def get_user_bids(request: Request):
+    """Get user's latest bid on every item they have bid on, keyed by item_id"""
+    session = request.cookies.get("session")
+    if not session:
+        logger.warning("Bids retrieval attempt without session cookie")
+        raise HTTPException(status_code=401, detail="Authentication required")
+
+    user_id = validate_session_token(session)
+    if not user_id:
+        logger.warning("Bids retrieval attempt with invalid session token")
+        raise HTTPException(status_code=401, detail="Invalid or expired session")
+
+    try:
+        async with read_pool.acquire() as db:
+            rows = await db.execute_fetchall(SQL_USER_LATEST_BIDS, (user_id,))
+
+        return {
+            item_id: {"uid": create_bid_token(bid_id), "amount": amount, "is_highest": is_highest == 1}
+            for item_id, bid_id, amount, is_highest in rows
+        }
+
+    except Exception as e:
+        logger.error("Failed to retrieve bids: %s", e, exc_info=True)
+        raise HTTPException(status_code=500, detail="Failed to retrieve bids")
+
 @app.delete("/bid/{id}")
 async def delete_bid(
     id: str,
-    db: aiosqlite.Connection = Depends(get_db),
+    db: aiosqlite.Connection = Depends(get_write_db),
     session: str | None = Cookie(None)
 ):
-    """Delete user's bid by UUID"""
+    """Delete user's bid by the uid returned from GET /bid/{item_id}"""
     if not session:
         logger.warning("Bid deletion attempt without session cookie")
         raise HTTPException(status_code=401, detail="Authentication required")
@@ -606,55 +943,48 @@ async def delete_bid(
         raise HTTPException(status_code=401, detail="Invalid or expired session")
 
     try:
-        logger.info(f"Bid deletion attempt by user {user_id} for bid {id}")
+        logger.info("Bid deletion attempt by user %s for bid %s", user_id, id)
 
-        cursor = await db.execute(
-            "SELECT item_id FROM bids WHERE uuid = ? AND user_id = ?",
-            (id, user_id)
-        )
-        bid_row = await cursor.fetchone()
-        await cursor.close()
+        bid_id = load_bid_token(id)
 
-        if not bid_row:
-            logger.warning(f"Bid {id} not found or doesn't belong to user {user_id}")
-            raise HTTPException(status_code=404, detail="Bid not found")
+        # The ownership and closed checks and the delete see the same state
+        async with immediate_transaction(db):
+            rows = await db.execute_fetchall(SQL_USER_BID_ITEM, (bid_id, user_id)) if bid_id is not None else []
+            bid_row = rows[0] if rows else None
 
-        item_id = bid_row[0]
+            if not bid_row:
+                logger.warning("Bid %s not found or doesn't belong to user %s", id, user_id)
+                raise HTTPException(status_code=404, detail="Bid not found")
 
-        cursor = await db.execute(
-            "SELECT is_closed FROM items WHERE id = ?",
-            (item_id,)
-        )
-        item_row = await cursor.fetchone()
-        await cursor.close()
+            (item_id,) = bid_row
 
-        if item_row and bool(item_row[0]):
-            logger.info(f"Bid deletion rejected: item {item_id} is closed")
-            raise HTTPException(
-                status_code=400,
-                detail="Cannot cancel bid - bidding for this item has closed"
-            )
+            rows = await db.execute_fetchall(SQL_ITEM_IS_CLOSED, (item_id,))
+            item_row = rows[0] if rows else None
 
-        cursor = await db.execute(
-            "DELETE FROM bids WHERE uuid = ? AND user_id = ?",
-            (id, user_id)
-        )
-        await cursor.close()
-        await db.commit()
+            if item_row and item_row[0]:
+                logger.info("Bid deletion rejected: item %s is closed", item_id)
+                raise HTTPException(
+                    status_code=400,
+                    detail="Cannot cancel bid - bidding for this item has closed"
+                )
+
+            await db.execute_fetchall(SQL_DELETE_BID, (bid_id, user_id))
+
+        invalidate_catalog()
 
-        logger.info(f"Bid {id} deleted successfully by user {user_id}")
+        logger.info("Bid %s deleted successfully by user %s", id, user_id)
         return {"message": "Bid deleted successfully"}
 
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Failed to delete bid: {str(e)}", exc_info=True)
+        logger.error("Failed to delete bid: %s", e, exc_info=True)
         raise HTTPException(status_code=500, detail="Failed to delete bid")
 
 @app.post("/donate")
 async def donate(
     request: DonateRequest,
-    db: aiosqlite.Connection = Depends(get_db),
+    db: aiosqlite.Connection = Depends(get_write_db),
     session: str | None = Cookie(None)
 ):
     """Create or update user's donation"""
@@ -668,31 +998,22 @@ async def donate(
         raise HTTPException(status_code=401, detail="Invalid or expired session")
 
     try:
-        logger.info(f"Donation attempt by user {user_id}: ${request.amount}")
-        donation_uuid = str(uuid.uuid4())
-
-        cursor = await db.execute(
-            """INSERT INTO donations (uuid, user_id, amount, updated_at)
-               VALUES (?, ?, ?, datetime('now', 'utc'))
-               ON CONFLICT(user_id) DO UPDATE SET
-                   amount = excluded.amount,
-                   updated_at = datetime('now', 'utc')""",
-            (donation_uuid, user_id, request.amount)
-        )
-        await cursor.close()
-        await db.commit()
+        logger.info("Donation attempt by user %s: $%s", user_id, request.amount)
+
+        async with immediate_transaction(db):
+            await db.execute_fetchall(SQL_UPSERT_DONATION, (user_id, request.amount))
 
-        logger.info(f"Donation recorded successfully by user {user_id}: ${request.amount}")
+        logger.info("Donation recorded successfully by user %s: $%s", user_id, request.amount)
         return {"message": "Donation recorded successfully"}
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Failed to record donation: {str(e)}", exc_info=True)
+        logger.error("Failed to record donation: %s", e, exc_info=True)
         raise HTTPException(status_code=500, detail="Failed to record donation")
 
 @app.get("/donations")
 async def get_donation(
-    db: aiosqlite.Connection = Depends(get_db),
+    db: aiosqlite.Connection = Depends(get_read_db),
     session: str | None = Cookie(None)
 ):
     """Get user's donation amount"""
@@ -706,108 +1027,63 @@ async def get_donation(
         raise HTTPException(status_code=401, detail="Invalid or expired session")
 
     try:
-        cursor = await db.execute(
-            "SELECT amount FROM donations WHERE user_id = ?",
-            (user_id,)
-        )
-        row = await cursor.fetchone()
-        await cursor.close()
+        rows = await db.execute_fetchall(SQL_USER_DONATION, (user_id,))
+        row = rows[0] if rows else None
 
         if not row:
-            logger.info(f"No donation found for user {user_id}")
+            logger.info("No donation found for user %s", user_id)
             raise HTTPException(status_code=400, detail="No donation found")
 
-        amount = row[0]
-        logger.info(f"Retrieved donation for user {user_id}: ${amount}")
+        (amount,) = row
+        logger.info("Retrieved donation for user %s: $%s", user_id, amount)
         return {"amount": amount}
 
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Failed to retrieve donation: {str(e)}", exc_info=True)
+        logger.error("Failed to retrieve donation: %s", e, exc_info=True)
         raise HTTPException(status_code=500, detail="Failed to retrieve donation")
 
-@app.get("/admin/bids", response_model=dict[int, list[BidInfo]])
+@app.get("/admin/bids", responses={200: {"model": dict[int, list[BidInfo]]}})
 async def get_all_bids(
-    db: aiosqlite.Connection = Depends(get_db),
+    db: aiosqlite.Connection = Depends(get_admin_db),
     _: bool = Depends(verify_admin_session)
 ):
     """Get all bids for all items, grouped by item_id (Admin only - requires admin session)"""
     try:
         logger.info("Admin access to bids")
-        cursor = await db.execute(
-            """SELECT
-                   b.item_id,
-                   i.title,
-                   a.name,
-                   a.email,
-                   b.amount,
-                   b.created_at
-               FROM bids b
-               JOIN items i ON b.item_id = i.id
-               JOIN accounts a ON b.user_id = a.id
-               ORDER BY b.item_id, b.created_at DESC"""
-        )
-        rows = await cursor.fetchall()
-        await cursor.close()
-
-        # Group bids by item_id
-        bids_by_item: dict[int, list[BidInfo]] = {}
-        for row in rows:
-            item_id = row[0]
-            bid_info = BidInfo(
-                itemTitle=row[1],
-                bidderName=row[2],
-                userEmail=row[3],
-                amount=row[4],
-                createdAt=row[5]
-            )
-
-            if item_id not in bids_by_item:
-                bids_by_item[item_id] = []
-            bids_by_item[item_id].append(bid_info)
-        return bids_by_item
+        # SQLite builds the whole response body
+        rows = await db.execute_fetchall(SQL_ADMIN_BIDS)
+        return Response(content=rows[0][0], media_type="application/json")
 
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Failed to fetch admin bids: {str(e)}", exc_info=True)
+        logger.error("Failed to fetch admin bids: %s", e, exc_info=True)
         raise HTTPException(status_code=500, detail="Failed to fetch bids")
 
-@app.get("/admin/donations", response_model=list[DonationInfo])
+@app.get("/admin/donations", responses={200: {"model": list[DonationInfo]}})
 async def get_all_donations(
-    db: aiosqlite.Connection = Depends(get_db),
+    db: aiosqlite.Connection = Depends(get_admin_db),
     _: bool = Depends(verify_admin_session)
 ):
     """Get all donations (Admin only)"""
     try:
-        cursor = await db.execute(
-            """SELECT
-                   a.name,
-                   a.email,
-                   d.amount,
-                   d.updated_at
-               FROM donations d
-               JOIN accounts a ON d.user_id = a.id
-               ORDER BY d.updated_at DESC"""
-        )
-        rows = await cursor.fetchall()
-        await cursor.close()
+        rows = await db.execute_fetchall(SQL_ADMIN_DONATIONS)
 
         donations = [
-            DonationInfo(
-                userName=row[0],
-                userEmail=row[1],
-                amount=row[2],
-                createdAt=row[3]
-            )
-            for row in rows
+            {
+                "userName": name,
+                "userEmail": email,
+                "amount": amount,
+                "createdAt": updated_at
+            }
+            for name, email, amount, updated_at in rows
         ]
-
-        return donations
+        return ORJSONResponse(donations)
 
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Failed to fetch admin donations: {str(e)}", exc_info=True)
+        logger.error("Failed to fetch admin donations: %s", e, exc_info=True)
         raise HTTPException(status_code=500, detail="Failed to fetch donations")
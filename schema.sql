@@ -12,7 +12,7 @@ CREATE TABLE IF NOT EXISTS "items" (
     year INTEGER NOT NULL,
     description TEXT NOT NULL,
     show_order INTEGER UNIQUE NOT NULL,
-    is_closed BOOLEAN NOT NULL DEFAULT FALSE
+    is_closed BOOLEAN NOT NULL DEFAULT FALSE CHECK (is_closed IN (0, 1))
 );
 
 -- User accounts table
@@ -25,7 +25,7 @@ CREATE TABLE IF NOT EXISTS "accounts" (
 
 -- Bids table
 CREATE TABLE IF NOT EXISTS "bids" (
-    uuid TEXT PRIMARY KEY,
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
     user_id INTEGER NOT NULL,
     item_id INTEGER NOT NULL,
     amount INTEGER NOT NULL,
@@ -34,10 +34,13 @@ CREATE TABLE IF NOT EXISTS "bids" (
     FOREIGN KEY (item_id) REFERENCES items(id)
 );
 
+-- Highest bid per item, and a user's latest bid on an item
+CREATE INDEX IF NOT EXISTS idx_bids_item_amount ON bids(item_id, amount DESC);
+CREATE INDEX IF NOT EXISTS idx_bids_user_item ON bids(user_id, item_id);
+
 -- Donations table
 CREATE TABLE IF NOT EXISTS "donations" (
-    uuid TEXT PRIMARY KEY,
-    user_id INTEGER UNIQUE NOT NULL,
+    user_id INTEGER PRIMARY KEY,
     amount INTEGER NOT NULL,
     updated_at DATETIME NOT NULL,
     FOREIGN KEY (user_id) REFERENCES accounts(id)